@@ -0,0 +1,29 @@
+-- Bulk-insert RPC for the stock_optimisation_store table.
+-- Expands the JSON payload server-side with jsonb_array_elements so a large
+-- save is parsed once by Postgres instead of row-by-row through PostgREST.
+-- Apply with the Supabase SQL editor or `supabase db push`.
+create or replace function save_predictions(rows jsonb)
+returns void
+language sql
+as $$
+    insert into stock_optimisation_store (
+        id,
+        created_at,
+        as_of_date,
+        ticker,
+        predicted_price,
+        predicted_return,
+        actual_prices_last_month,
+        portfolio_weight
+    )
+    select
+        (r ->> 'id')::uuid,
+        (r ->> 'created_at')::timestamptz,
+        (r ->> 'as_of_date')::date,
+        r ->> 'ticker',
+        (r ->> 'predicted_price')::double precision,
+        (r ->> 'predicted_return')::double precision,
+        r ->> 'actual_prices_last_month',
+        (r ->> 'portfolio_weight')::double precision
+    from jsonb_array_elements(rows) as r;
+$$;
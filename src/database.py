@@ -1,59 +1,214 @@
-"""Database operations for saving optimisation results to Supabase."""
+"""Persistence for optimisation results: Supabase database and local files."""
 
 from __future__ import annotations
 
 import json
 import logging
 import os
+import random
+import threading
+import time
 import uuid
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 
+import httpx
+import numpy as np
 from dotenv import load_dotenv
+from postgrest.exceptions import APIError
 from supabase import Client, create_client
 
-from src.settings import SUPABASE_TABLE_NAME
+from src.settings import (
+    BULK_RPC_NAME,
+    BULK_RPC_THRESHOLD,
+    INSERT_BATCH_SIZE,
+    INSERT_MAX_PARALLEL,
+    INSERT_MAX_RETRIES,
+    SUPABASE_TABLE_NAME,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None  # type: ignore[assignment]
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Credentials are read once at import time; a process restart is needed to
+# pick up new values (standard for config constants)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj: Any) -> str:
+    """Serialise an object to a JSON string, preferring orjson when available.
+
+    NumPy arrays are encoded directly from their buffer by orjson; the
+    stdlib fallback converts them to lists first.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    if isinstance(obj, np.ndarray):
+        obj = obj.tolist()
+    return json.dumps(obj)
+
+
+def _json_default(obj: Any) -> Any:
+    """Fallback encoder for stdlib json: unbox NumPy arrays, stringify the rest."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+# Client is cached per process: create_client sets up connection pools, so
+# building it once preserves keep-alive connections across repeated saves.
+_client: Client | None = None
+_table: Any = None
+_client_lock = threading.Lock()
+
+
 def get_supabase_client() -> Client | None:
     """
-    Create and return Supabase client from environment variables.
+    Return a cached Supabase client built from environment variables.
 
     Returns:
         Supabase client if credentials are available, None otherwise
     """
-    url = os.environ.get("SUPABASE_URL")
-    key = os.environ.get("SUPABASE_KEY")
+    global _client
+
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            if not SUPABASE_URL or not SUPABASE_KEY:
+                logger.warning("Supabase credentials not found in environment variables")
+                return None
 
-    if not url or not key:
-        logger.warning("Supabase credentials not found in environment variables")
-        return None
+            _client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-    return create_client(url, key)
+    return _client
 
 
-def save_results_to_supabase(result: dict[str, Any]) -> None:
+def get_supabase_table() -> Any:
+    """
+    Return a cached request builder for the results table.
+
+    The table handle is resolved once per process alongside the client, so
+    repeated saves skip the per-call router traversal.
+
+    Returns:
+        Table request builder if credentials are available, None otherwise
+    """
+    global _table
+
+    if _table is None:
+        client = get_supabase_client()
+        if client is None:
+            return None
+        _table = client.table(SUPABASE_TABLE_NAME)
+
+    return _table
+
+
+def _split_and_retry(table: Any, batch: list[dict[str, Any]]) -> None:
+    """Insert a failing batch again as two halves."""
+    mid = len(batch) // 2
+    _insert_with_retry(table, batch[:mid])
+    _insert_with_retry(table, batch[mid:])
+
+
+def _insert_with_retry(table: Any, batch: list[dict[str, Any]]) -> None:
+    """
+    Insert a batch with bounded retries around transient errors.
+
+    Losing a save to a timeout or a transient 5xx forces the whole
+    optimisation (minutes of Prophet fitting) to be rerun, so transport
+    errors and server-side 5xx APIErrors are retried with exponential
+    backoff and jitter. A 413 payload-too-large response is retried
+    immediately as two halves, other 4xx errors propagate at once, and a
+    batch that exhausts its retries is split in half as a last resort.
+
+    Args:
+        table: Request builder for the target table
+        batch: Prepared row dicts to insert
+    """
+    for attempt in range(INSERT_MAX_RETRIES):
+        try:
+            table.insert(batch).execute()
+            return
+        except (httpx.HTTPError, APIError) as e:
+            if isinstance(e, APIError):
+                code = str(e.code or "")
+                if code == "413" and len(batch) > 1:
+                    # Payload too large: waiting won't help, halving will
+                    _split_and_retry(table, batch)
+                    return
+                if not code.startswith("5"):
+                    raise
+            if attempt == INSERT_MAX_RETRIES - 1:
+                if len(batch) > 1:
+                    logger.warning(
+                        "Batch of %d rows kept failing (%s); retrying as two halves",
+                        len(batch),
+                        e,
+                    )
+                    _split_and_retry(table, batch)
+                    return
+                raise
+            time.sleep(min(30.0, 2.0**attempt) + random.random())
+
+
+def _bulk_insert_via_rpc(rows: list[dict[str, Any]]) -> bool:
+    """
+    Try to insert rows through the save_predictions SQL function.
+
+    The function (scripts/save_predictions.sql) expands the payload with
+    jsonb_array_elements server-side, so the whole batch is parsed once by
+    Postgres instead of row-by-row through PostgREST.
+
+    Args:
+        rows: Prepared row dicts matching the table columns
+
+    Returns:
+        True if the RPC succeeded, False if it is unavailable
+    """
+    client = get_supabase_client()
+    if client is None:
+        return False
+
+    try:
+        client.rpc(BULK_RPC_NAME, {"rows": rows}).execute()
+        return True
+    except Exception as e:
+        logger.warning(
+            "Bulk RPC %s unavailable (%s); falling back to batched insert", BULK_RPC_NAME, e
+        )
+        return False
+
+
+def save_results_to_supabase(result: dict[str, Any], *, required: bool = False) -> bool:
     """
     Save optimisation results to Supabase database.
 
     Args:
         result: Dictionary containing optimisation results from run_optimisation()
             Expected keys: predictions, predicted_returns, weights
+        required: If True, missing credentials raise instead of skipping the
+            save. Defaults to False so dev environments without Supabase
+            configured just log a warning.
+
+    Returns:
+        True if rows were saved, False if the save was skipped
 
     Raises:
-        ValueError: If Supabase client cannot be created or insertion fails
+        ValueError: If required is True and the Supabase client cannot be created
     """
-    supabase = get_supabase_client()
-    if supabase is None:
-        raise ValueError(
-            "Supabase client not available. Check SUPABASE_URL and SUPABASE_KEY environment variables."
-        )
-
     as_of_date = result.get("date")
     predictions = result.get("predictions", {})
     predicted_returns = result.get("predicted_returns", {})
@@ -62,24 +217,118 @@ def save_results_to_supabase(result: dict[str, Any]) -> None:
 
     if not predictions:
         logger.warning("No predictions to save")
-        return
-
-    # Prepare rows for insertion - one row per stock
-    rows = []
-    for ticker in predictions.keys():
-        row = {
-            "id": str(uuid.uuid4()),
-            "created_at": datetime.now().isoformat(),
-            "as_of_date": as_of_date.isoformat() if as_of_date else None,
+        return False
+
+    table = get_supabase_table()
+    if table is None:
+        if required:
+            raise ValueError(
+                "Supabase client not available. Check SUPABASE_URL and SUPABASE_KEY environment variables."
+            )
+        logger.warning("Supabase not configured; skipping database save")
+        return False
+
+    # Hoist per-row invariants out of the loop: one timestamp, one ISO date,
+    # and a single urandom read sliced into per-row v4 UUIDs.
+    created_at = datetime.now(timezone.utc).isoformat()
+    as_of_iso = as_of_date.isoformat() if as_of_date else None
+    rand = os.urandom(16 * len(predictions))
+
+    # Prepare rows for insertion - one row per stock. Build aligned columns
+    # in one pass per source dict (binding hot names locally), then zip them
+    # into rows; predictions[k] is a direct lookup since the keys come from it.
+    _returns_get = predicted_returns.get
+    _weights_get = weights.get
+    _actuals_get = actual_prices_last_month.get
+    _float = float
+    keys = list(predictions)
+    preds = [_float(predictions[k]) for k in keys]
+    rets = [_float(_returns_get(k, 0.0)) for k in keys]
+    wts = [_float(_weights_get(k, 0.0)) for k in keys]
+    acts = [_dumps(_actuals_get(k, [])) for k in keys]
+    rows = [
+        {
+            "id": str(uuid.UUID(bytes=rand[i * 16 : (i + 1) * 16], version=4)),
+            "created_at": created_at,
+            "as_of_date": as_of_iso,
             "ticker": ticker,
-            "predicted_price": float(predictions.get(ticker, 0.0)),
-            "predicted_return": float(predicted_returns.get(ticker, 0.0)),
-            "actual_prices_last_month": json.dumps(actual_prices_last_month.get(ticker, [])),
-            "portfolio_weight": float(weights.get(ticker, 0.0)),
+            "predicted_price": pred,
+            "predicted_return": ret,
+            "actual_prices_last_month": act,
+            "portfolio_weight": wt,
         }
-        rows.append(row)
+        for i, (ticker, pred, ret, wt, act) in enumerate(
+            zip(keys, preds, rets, wts, acts, strict=True)
+        )
+    ]
 
     logger.info(f"Inserting {len(rows)} rows into Supabase...")
-    (supabase.table(SUPABASE_TABLE_NAME).insert(rows).execute())
+    if len(rows) >= BULK_RPC_THRESHOLD and _bulk_insert_via_rpc(rows):
+        pass
+    elif len(rows) <= INSERT_BATCH_SIZE:
+        _insert_with_retry(table, rows)
+    else:
+        # Split into bounded batches and overlap the HTTP round-trips
+        batches = [rows[i : i + INSERT_BATCH_SIZE] for i in range(0, len(rows), INSERT_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=INSERT_MAX_PARALLEL) as executor:
+            list(executor.map(lambda batch: _insert_with_retry(table, batch), batches))
 
     logger.info(f"Successfully saved {len(rows)} predictions to Supabase")
+    return True
+
+
+def save_results_to_files(
+    result: dict[str, Any],
+    output_dir: str | Path = "results",
+) -> tuple[Path, Path]:
+    """
+    Save optimisation results to a text summary and a JSON file.
+
+    Each file is written with a single write call: the summary is joined
+    into one string up front, and the JSON payload is encoded to one bytes
+    buffer before it touches the disk.
+
+    Args:
+        result: Dictionary containing optimisation results from run_optimisation()
+        output_dir: Directory to write the files into. Created if missing.
+
+    Returns:
+        Tuple of (summary text path, JSON path)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    as_of_date = result.get("date")
+    date_tag = as_of_date.isoformat() if as_of_date else "latest"
+
+    predictions = result.get("predictions", {})
+    weights = result.get("weights", {})
+
+    txt_path = output_dir / f"optimisation_{date_tag}.txt"
+    json_path = output_dir / f"optimisation_{date_tag}.json"
+
+    lines = [
+        "Portfolio Optimisation Results",
+        f"Date: {date_tag}",
+        "",
+        "Predicted Prices (Next Day):",
+        *(f"  {ticker}: ${price:.2f}" for ticker, price in predictions.items()),
+        "",
+        "Optimal Portfolio Weights:",
+        *(f"  {ticker}: {weight * 100:.2f}%" for ticker, weight in weights.items()),
+        "",
+    ]
+    txt_path.write_text("\n".join(lines))
+
+    if orjson is not None:
+        # orjson serialises date/datetime natively, so result goes in as-is
+        json_path.write_bytes(
+            orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
+    else:
+        # Fused dict-unpack swaps in the ISO date without a copy-then-assign
+        payload = {**result, "date": as_of_date.isoformat()} if as_of_date else result
+        json_path.write_text(json.dumps(payload, indent=2, default=_json_default))
+
+    logger.info("Saved results to %s and %s", txt_path, json_path)
+    return txt_path, json_path
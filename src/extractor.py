@@ -1,11 +1,13 @@
 """Data extraction module for fetching stock data from yfinance."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import pandas as pd
 import yfinance as yf
 
-from .settings import END_DATE, START_DATE
+from .settings import START_DATE, default_end_date
 
 logger = logging.getLogger(__name__)
 
@@ -66,7 +68,7 @@ def _extract_single_ticker_data(ticker: str, start_date: str, end_date: str) ->
 def extract_data(
     tickers: list[str],
     start_date: str = START_DATE,
-    end_date: str = END_DATE,
+    end_date: str | None = None,
 ) -> dict[str, pd.DataFrame]:
     """
     Extract historical stock data for multiple tickers.
@@ -74,16 +76,24 @@ def extract_data(
     Args:
         tickers: List of stock ticker symbols
         start_date: Start date for data download (YYYY-MM-DD format)
-        end_date: End date for data download (YYYY-MM-DD format)
+        end_date: End date for data download (YYYY-MM-DD format). Defaults to today.
 
     Returns:
         Dictionary mapping ticker to DataFrame with columns ['Price', 'Returns']
     """
-    all_stock_data: dict[str, pd.DataFrame] = {}
-
-    for ticker in tickers:
-        df_processed = _extract_single_ticker_data(ticker, start_date, end_date)
-        if df_processed is not None:
-            all_stock_data[ticker] = df_processed
-
-    return all_stock_data
+    if not tickers:
+        return {}
+
+    end_date = end_date or default_end_date()
+
+    # Downloads are network-bound, so fetch all tickers concurrently instead
+    # of paying one HTTP round-trip after another
+    fetch_one = partial(_extract_single_ticker_data, start_date=start_date, end_date=end_date)
+    with ThreadPoolExecutor(max_workers=len(tickers)) as executor:
+        results = executor.map(fetch_one, tickers)
+
+    return {
+        ticker: df_processed
+        for ticker, df_processed in zip(tickers, results, strict=True)
+        if df_processed is not None
+    }
@@ -8,12 +8,12 @@ from typing import Any
 
 import pandas as pd
 
-from src.database import save_results_to_supabase
+from src.database import save_results_to_files, save_results_to_supabase
 from src.extractor import extract_data
 from src.model import ProphetModel
 from src.optimiser import optimize_portfolio_mean_variance
 from src.processor import append_predictions, collect_recent_prices, preprocess_data
-from src.settings import END_DATE, PORTFOLIO_TICKERS, START_DATE
+from src.settings import PORTFOLIO_TICKERS, START_DATE, default_end_date
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -23,7 +23,7 @@ logger = logging.getLogger(__name__)
 def run_optimisation(
     tickers: list[str],
     start_date: str = START_DATE,
-    end_date: str = END_DATE,
+    end_date: str | None = None,
 ) -> dict[str, Any]:
     """
     Run portfolio optimisation: pull data, predict, calculate allocation, and log result.
@@ -31,7 +31,7 @@ def run_optimisation(
     Args:
         tickers: List of stock ticker symbols
         start_date: Start date for historical data (YYYY-MM-DD format). Defaults to START_DATE.
-        end_date: End date for historical data (YYYY-MM-DD format). Defaults to END_DATE.
+        end_date: End date for historical data (YYYY-MM-DD format). Defaults to today.
 
     Returns:
         Dictionary containing optimisation results with keys:
@@ -45,8 +45,9 @@ def run_optimisation(
     Returns empty dict if data extraction fails.
     """
 
+    end_date = end_date or default_end_date()
     as_of_date = pd.to_datetime(end_date).date()
-    logger.info(f"Starting portfolio optimisation for tickers: {tickers} as of {as_of_date}")
+    logger.info("Starting portfolio optimisation for tickers: %s as of %s", tickers, as_of_date)
 
     # 1. Extract historical data
     logger.info("Extracting historical data...")
@@ -59,6 +60,11 @@ def run_optimisation(
     logger.info("Preprocessing data...")
     portfolio_data = preprocess_data(all_stock_data)
 
+    # Wide price frame (dates x tickers) so current prices come from a single
+    # tail read instead of one .iloc[-1] per ticker DataFrame
+    prices_wide = pd.concat({ticker: df["Price"] for ticker, df in portfolio_data.items()}, axis=1)
+    current_prices = prices_wide.iloc[-1].to_dict()
+
     # 3. Predict next step using Prophet
     logger.info("Generating predictions...")
     model = ProphetModel()
@@ -74,25 +80,32 @@ def run_optimisation(
     logger.info("Calculating optimal portfolio allocation...")
     weights_dict = optimize_portfolio_mean_variance(predicted_data)
 
-    # 7. Log results
-    logger.info("Portfolio Optimisation Results")
-    logger.info(f"Date: {as_of_date}")
-
-    logger.info("\nPredicted Prices (Next Day):")
-    for ticker, price in predictions.items():
-        logger.info(f"  {ticker}: ${price:.2f}")
-
-    logger.info("\nPredicted Returns:")
-    for ticker, ret in predicted_returns.items():
-        logger.info(f"  {ticker}: {ret * 100:.2f}%")
-
-    logger.info("\nOptimal Portfolio Weights:")
-    for ticker, weight in weights_dict.items():
-        logger.info(f"  {ticker}: {weight * 100:.2f}%")
+    # 7. Log results as a single emit so handler and formatter run once
+    # instead of once per ticker per block
+    lines = [
+        "=" * 70,
+        "Portfolio Optimisation Results",
+        "=" * 70,
+        f"Date: {as_of_date}",
+        "",
+        "Predicted Prices (Next Day):",
+        *(
+            f"  {ticker}: ${price:.2f} (Current: ${current_prices[ticker]:.2f})"
+            for ticker, price in predictions.items()
+        ),
+        "",
+        "Predicted Returns:",
+        *(f"  {ticker}: {ret * 100:.2f}%" for ticker, ret in predicted_returns.items()),
+        "",
+        "Optimal Portfolio Weights:",
+        *(f"  {ticker}: {weight * 100:.2f}%" for ticker, weight in weights_dict.items()),
+    ]
+    logger.info("\n%s", "\n".join(lines))
 
     return {
         "date": as_of_date,
         "predictions": predictions,
+        "current_prices": current_prices,
         "predicted_returns": predicted_returns,
         "actual_prices_last_month": actual_prices_last_month,
         "weights": weights_dict,
@@ -108,16 +121,21 @@ def main() -> None:
             logger.error("Optimisation returned empty result")
             sys.exit(1)
 
+        save_results_to_files(result)
+
         try:
-            save_results_to_supabase(result)
+            # The CLI entry point is run to persist results, so missing
+            # credentials are a hard failure here; library callers keep the
+            # soft-skip default
+            save_results_to_supabase(result, required=True)
             print("\nResults successfully saved to Supabase database")
         except Exception as db_error:
-            logger.error(f"Failed to save to Supabase: {db_error}")
+            logger.error("Failed to save to Supabase: %s", db_error)
             print(f"\nWarning: Failed to save to Supabase: {db_error}")
             sys.exit(1)
 
     except Exception as e:
-        logger.error(f"Error during optimisation: {e}")
+        logger.error("Error during optimisation: %s", e)
         print(f"Error during optimisation: {e}", file=sys.stderr)
         import traceback
 
@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
 
+import numpy as np
 import pandas as pd
 import pandas_market_calendars as mcal
 from prophet import Prophet
@@ -88,6 +91,28 @@ def _get_us_trading_holidays(start_year: int = 2020, end_year: int = 2030) -> pd
     return holidays_df
 
 
+def _fit_one(ticker: str, df_stock: pd.DataFrame) -> tuple[str, float, float]:
+    """
+    Fit a Prophet model for a single ticker and predict the next day's price.
+
+    Module-level so it is picklable for worker processes.
+
+    Args:
+        ticker: Stock ticker symbol
+        df_stock: DataFrame with 'Price' column and date index
+
+    Returns:
+        Tuple of (ticker, predicted_price, current_price)
+    """
+    # Keep the Stan backend quiet inside worker processes
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+    current_price = float(df_stock["Price"].iloc[-1])
+    predicted_price = ProphetModel().predict_next(df_stock["Price"])
+
+    return ticker, predicted_price, current_price
+
+
 class ProphetModel:
     """Prophet model for forecasting stock prices."""
 
@@ -181,24 +206,26 @@ class ProphetModel:
             - predictions: dict[str, float] mapping ticker to predicted price
             - predicted_returns: dict[str, float] mapping ticker to predicted return
         """
-        predictions: dict[str, float] = {}
-        predicted_returns: dict[str, float] = {}
-        current_prices: dict[str, float] = {}
-
-        for ticker in portfolio_data.keys():
-            # Get stock data
-            df_stock = portfolio_data[ticker]
-
-            # Get current price
-            current_price = df_stock["Price"].iloc[-1]
-            current_prices[ticker] = current_price
-
-            # Predict next day price
-            predicted_price = self.predict_next(df_stock["Price"])
-            predictions[ticker] = predicted_price
-
-            # Calculate predicted return
-            daily_return = (predicted_price - current_price) / current_price
-            predicted_returns[ticker] = daily_return
+        if not portfolio_data:
+            return {}, {}
+
+        # Prophet fitting is CPU-bound and independent per ticker, so fan the
+        # fits out across processes (up to one per core)
+        max_workers = min(len(portfolio_data), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(_fit_one, portfolio_data.keys(), portfolio_data.values())
+            )
+
+        # Assemble results column-wise: the returns come from one vectorised
+        # expression and .tolist() converts to native floats in a single C
+        # loop instead of a Python-level float() call per value
+        tickers = [ticker for ticker, _, _ in results]
+        preds = np.asarray([price for _, price, _ in results], dtype=np.float64)
+        currents = np.asarray([price for _, _, price in results], dtype=np.float64)
+        returns = (preds - currents) / currents
+
+        predictions = dict(zip(tickers, preds.tolist(), strict=True))
+        predicted_returns = dict(zip(tickers, returns.tolist(), strict=True))
 
         return predictions, predicted_returns
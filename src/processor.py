@@ -3,6 +3,7 @@
 import logging
 from datetime import timedelta
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -78,27 +79,30 @@ def append_predictions(
 def collect_recent_prices(
     portfolio_data: dict[str, pd.DataFrame],
     days: int = 30,
-) -> dict[str, list[float]]:
+) -> dict[str, np.ndarray]:
     """
     Collect the most recent prices for each ticker over the given trailing window.
 
+    Prices are kept as float64 arrays so serialisation can read them straight
+    from the buffer instead of walking boxed Python floats.
+
     Args:
         portfolio_data: Dictionary of historical DataFrames per ticker.
         days: Number of trailing days (inclusive) to include. Defaults to 30.
 
     Returns:
-        Dictionary mapping ticker to a list of recent price floats ordered by date.
+        Dictionary mapping ticker to a float64 array of recent prices ordered by date.
     """
-    recent_prices: dict[str, list[float]] = {}
+    recent_prices: dict[str, np.ndarray] = {}
 
     for ticker, df in portfolio_data.items():
         if df.empty:
-            recent_prices[ticker] = []
+            recent_prices[ticker] = np.empty(0, dtype=np.float64)
             continue
 
         last_date = df.index[-1]
         cutoff = last_date - timedelta(days=days)
         recent_series = df.loc[df.index >= cutoff, "Price"]
-        recent_prices[ticker] = [float(value) for value in recent_series.tolist()]
+        recent_prices[ticker] = recent_series.to_numpy(dtype=np.float64)
 
     return recent_prices
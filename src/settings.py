@@ -1,5 +1,5 @@
 """Settings and constants for portfolio optimisation."""
-from datetime import datetime
+from datetime import date
 
 # Risk parameters
 MINIMUM_ALLOCATION = 0.05  # Minimum allocation per asset (5%)
@@ -8,7 +8,15 @@ RISK_AVERSION = 5
 
 # Date defaults
 START_DATE = "2024-01-01"  # Default start date for historical data
-END_DATE = datetime.now().strftime("%Y-%m-%d")
+
+
+def default_end_date() -> str:
+    """Return today's date as the default end date for historical data.
+
+    Evaluated at call time rather than import time so long-running
+    processes do not freeze the default on the day they started.
+    """
+    return date.today().isoformat()
 
 # Stock Allocation
 PORTFOLIO_TICKERS = [
@@ -28,6 +36,11 @@ PORTFOLIO_TICKERS = [
 
 # Database
 SUPABASE_TABLE_NAME = "stock_optimisation_store"
+INSERT_BATCH_SIZE = 500  # Max rows per insert request (keeps payloads bounded)
+INSERT_MAX_PARALLEL = 4  # Max concurrent insert requests
+INSERT_MAX_RETRIES = 5  # Attempts per batch around transient HTTP errors
+BULK_RPC_NAME = "save_predictions"  # SQL function from scripts/save_predictions.sql
+BULK_RPC_THRESHOLD = 2000  # Row count above which the bulk RPC is preferred
 
 # Holiday name mapping for Prophet model
 HOLIDAY_NAME_MAP = {
@@ -5,18 +5,30 @@ import uuid
 from datetime import date
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
+from postgrest.exceptions import APIError
 
-from src.database import get_supabase_client, save_results_to_supabase
+import src.database
+from src.database import get_supabase_client, save_results_to_files, save_results_to_supabase
 from src.settings import SUPABASE_TABLE_NAME
 
 
+@pytest.fixture(autouse=True)
+def reset_client_cache():
+    """Reset the cached Supabase client and table handle between tests."""
+    src.database._client = None
+    src.database._table = None
+    yield
+    src.database._client = None
+    src.database._table = None
+
+
 class TestGetSupabaseClient:
     """Test Supabase client creation."""
 
-    @patch.dict(
-        "os.environ", {"SUPABASE_URL": "https://test.supabase.co", "SUPABASE_KEY": "test-key"}
-    )
+    @patch("src.database.SUPABASE_URL", "https://test.supabase.co")
+    @patch("src.database.SUPABASE_KEY", "test-key")
     @patch("src.database.create_client")
     def test_get_supabase_client_with_credentials(self, mock_create_client: MagicMock) -> None:
         """Test get_supabase_client returns client when credentials are available."""
@@ -29,12 +41,26 @@ class TestGetSupabaseClient:
         assert result == mock_client
         mock_create_client.assert_called_once_with("https://test.supabase.co", "test-key")
 
-    @patch.dict("os.environ", {}, clear=True)
+    @patch("src.database.SUPABASE_URL", None)
+    @patch("src.database.SUPABASE_KEY", None)
     def test_get_supabase_client_without_credentials(self) -> None:
         """Test get_supabase_client returns None when both credentials are missing."""
         result = get_supabase_client()
         assert result is None
 
+    @patch("src.database.SUPABASE_URL", "https://test.supabase.co")
+    @patch("src.database.SUPABASE_KEY", "test-key")
+    @patch("src.database.create_client")
+    def test_get_supabase_client_is_cached(self, mock_create_client: MagicMock) -> None:
+        """Test get_supabase_client reuses the same client across calls."""
+        mock_create_client.return_value = MagicMock()
+
+        first = get_supabase_client()
+        second = get_supabase_client()
+
+        assert first is second
+        mock_create_client.assert_called_once()
+
 
 class TestSaveResultsToSupabase:
     """Test saving results to Supabase."""
@@ -179,3 +205,140 @@ class TestSaveResultsToSupabase:
         # Should propagate the exception
         with pytest.raises(Exception, match="Database connection error"):
             save_results_to_supabase(result)
+
+    @patch("src.database.get_supabase_client")
+    def test_save_results_to_supabase_without_client(self, mock_get_client: MagicMock) -> None:
+        """Test missing credentials skip the save unless required is set."""
+        mock_get_client.return_value = None
+
+        result = {
+            "date": date(2024, 1, 31),
+            "predictions": {"AAPL": 150.25},
+            "predicted_returns": {"AAPL": 0.02},
+            "weights": {"AAPL": 1.0},
+            "actual_prices_last_month": {"AAPL": [148.0]},
+        }
+
+        assert save_results_to_supabase(result) is False
+
+        with pytest.raises(ValueError, match="Supabase client not available"):
+            save_results_to_supabase(result, required=True)
+
+    @patch("src.database.time.sleep")
+    @patch("src.database.get_supabase_client")
+    def test_save_results_to_supabase_retries_transient_errors(
+        self, mock_get_client: MagicMock, mock_sleep: MagicMock
+    ) -> None:
+        """Test transient HTTP errors are retried before succeeding."""
+        mock_client = MagicMock()
+        mock_table = MagicMock()
+        mock_insert = MagicMock()
+
+        mock_client.table.return_value = mock_table
+        mock_table.insert.return_value = mock_insert
+        mock_insert.execute.side_effect = [httpx.ConnectTimeout("timed out"), MagicMock()]
+        mock_get_client.return_value = mock_client
+
+        result = {
+            "date": date(2024, 1, 31),
+            "predictions": {"AAPL": 150.25},
+            "predicted_returns": {"AAPL": 0.02},
+            "weights": {"AAPL": 1.0},
+            "actual_prices_last_month": {"AAPL": [148.0]},
+        }
+
+        save_results_to_supabase(result)
+
+        assert mock_insert.execute.call_count == 2
+        mock_sleep.assert_called_once()
+
+    @patch("src.database.time.sleep")
+    @patch("src.database.get_supabase_client")
+    def test_save_results_to_supabase_retries_server_api_errors(
+        self, mock_get_client: MagicMock, mock_sleep: MagicMock
+    ) -> None:
+        """Test 5xx APIErrors from PostgREST are retried before succeeding."""
+        mock_client = MagicMock()
+        mock_table = MagicMock()
+        mock_insert = MagicMock()
+
+        mock_client.table.return_value = mock_table
+        mock_table.insert.return_value = mock_insert
+        server_error = APIError(
+            {"message": "service unavailable", "code": "503", "hint": "", "details": ""}
+        )
+        mock_insert.execute.side_effect = [server_error, MagicMock()]
+        mock_get_client.return_value = mock_client
+
+        result = {
+            "date": date(2024, 1, 31),
+            "predictions": {"AAPL": 150.25},
+            "predicted_returns": {"AAPL": 0.02},
+            "weights": {"AAPL": 1.0},
+            "actual_prices_last_month": {"AAPL": [148.0]},
+        }
+
+        save_results_to_supabase(result)
+
+        assert mock_insert.execute.call_count == 2
+        mock_sleep.assert_called_once()
+
+    @patch("src.database.time.sleep")
+    @patch("src.database.get_supabase_client")
+    def test_save_results_to_supabase_client_api_error_not_retried(
+        self, mock_get_client: MagicMock, mock_sleep: MagicMock
+    ) -> None:
+        """Test 4xx APIErrors propagate immediately without retrying."""
+        mock_client = MagicMock()
+        mock_table = MagicMock()
+        mock_insert = MagicMock()
+
+        mock_client.table.return_value = mock_table
+        mock_table.insert.return_value = mock_insert
+        mock_insert.execute.side_effect = APIError(
+            {"message": "permission denied", "code": "401", "hint": "", "details": ""}
+        )
+        mock_get_client.return_value = mock_client
+
+        result = {
+            "date": date(2024, 1, 31),
+            "predictions": {"AAPL": 150.25},
+            "predicted_returns": {"AAPL": 0.02},
+            "weights": {"AAPL": 1.0},
+            "actual_prices_last_month": {"AAPL": [148.0]},
+        }
+
+        with pytest.raises(APIError, match="permission denied"):
+            save_results_to_supabase(result)
+
+        assert mock_insert.execute.call_count == 1
+        mock_sleep.assert_not_called()
+
+
+class TestSaveResultsToFiles:
+    """Test saving results to local files."""
+
+    def test_save_results_to_files(self, tmp_path) -> None:
+        """Test results are written as a text summary and a JSON file."""
+        result = {
+            "date": date(2024, 1, 31),
+            "predictions": {"AAPL": 150.25, "MSFT": 380.50},
+            "predicted_returns": {"AAPL": 0.02, "MSFT": 0.015},
+            "weights": {"AAPL": 0.4, "MSFT": 0.6},
+            "actual_prices_last_month": {"AAPL": [148.0], "MSFT": [375.0]},
+        }
+
+        txt_path, json_path = save_results_to_files(result, output_dir=tmp_path)
+
+        assert txt_path.exists()
+        assert json_path.exists()
+
+        summary = txt_path.read_text()
+        assert "Date: 2024-01-31" in summary
+        assert "AAPL" in summary
+        assert "MSFT" in summary
+
+        saved = json.loads(json_path.read_text())
+        assert saved["date"] == "2024-01-31"
+        assert saved["predictions"]["AAPL"] == 150.25
+        assert saved["weights"]["MSFT"] == 0.6
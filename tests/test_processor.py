@@ -141,7 +141,8 @@ class TestProcessor:
         recent_prices = collect_recent_prices(portfolio_data, days=30)
 
         assert "TICKER1" in recent_prices
-        assert isinstance(recent_prices["TICKER1"], list)
+        assert isinstance(recent_prices["TICKER1"], np.ndarray)
+        assert recent_prices["TICKER1"].dtype == np.float64
         # Expect roughly 31 values (including last day) for 30-day window
         assert len(recent_prices["TICKER1"]) >= 30
         # First value in recent list should match cutoff price